@@ -3,16 +3,23 @@ LangGraph MCP Agent Package
 
 Map-Reduce Partition Planner agent integrating Azure AI Search, Databricks MCP
 servers, and LangGraph's Send API for parallel RAG with human-in-the-loop review.
+
+Re-exports are resolved lazily (PEP 562): importing this package is free, and
+the heavy agent construction (WorkspaceClient auth, LLM endpoint, graph build)
+only runs on first attribute access.
 """
 
-from .agent import (
-    PartitionPlannerModel,
-    initialize_agent,
-    AGENT,
-    OverallState,
-    WorkerState,
-    partition_graph,
-)
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .agent import (
+        PartitionPlannerModel,
+        initialize_agent,
+        AGENT,
+        OverallState,
+        WorkerState,
+        partition_graph,
+    )
 
 __all__ = [
     "PartitionPlannerModel",
@@ -22,3 +29,11 @@ __all__ = [
     "WorkerState",
     "partition_graph",
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import agent
+
+        return getattr(agent, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,56 +1,61 @@
 import asyncio
+import logging
 import operator
 import os
-from typing import Annotated, Any, List, Optional, Sequence, TypedDict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Annotated, List, TypedDict
 
 import mlflow
 import nest_asyncio
 from azure.identity import ClientSecretCredential
 from azure.search.documents import SearchClient
 from databricks.sdk import WorkspaceClient
-from databricks_langchain import (
-    ChatDatabricks,
-    UCFunctionToolkit,
-    VectorSearchRetrieverTool,
-)
+from databricks_langchain import ChatDatabricks
 from databricks_mcp import DatabricksMCPClient, DatabricksOAuthClientProvider
-from langchain_core.language_models import LanguageModelLike
-from langchain_core.messages import AIMessage, AIMessageChunk, AnyMessage, HumanMessage, SystemMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 from langgraph.types import Command, Send, interrupt
-from mcp import ClientSession
-from mcp.client.streamable_http import streamablehttp_client as connect
 from pydantic import BaseModel, Field, create_model
 
 nest_asyncio.apply()
 
+logger = logging.getLogger(__name__)
+
 ############################################
 ## LLM endpoint — reads from env, falls back to config default
 ############################################
 LLM_ENDPOINT_NAME = os.getenv("DATABRICKS_ENDPOINT_NAME", "databricks-claude-3-7-sonnet")
 llm = ChatDatabricks(endpoint=LLM_ENDPOINT_NAME)
 
-system_prompt = "You are a helpful assistant that can run Python code."
-
 ###############################################################################
 ## Workspace client & MCP server URLs
 ###############################################################################
 profile_name = os.getenv("DATABRICKS_PROFILE", os.getenv("DATABRICKS_CONFIG_PROFILE", "development"))
 
-try:
-    workspace_client = WorkspaceClient(profile=profile_name)
-except Exception:
-    workspace_client = WorkspaceClient()
 
+@lru_cache(maxsize=None)
+def _get_workspace_client(profile: str = None) -> WorkspaceClient:
+    """Build a WorkspaceClient once per profile — auth discovery walks the
+    credential chain (env, profile files, metadata) and is not cheap."""
+    if profile is not None:
+        try:
+            return WorkspaceClient(profile=profile)
+        except Exception:
+            pass
+    return WorkspaceClient()
+
+
+workspace_client = _get_workspace_client(profile_name)
 host = workspace_client.config.host
 
-MANAGED_MCP_SERVER_URLS = [
+MANAGED_MCP_SERVER_URLS: tuple[str, ...] = (
     f"{host}/api/2.0/mcp/functions/system/ai",
-]
-CUSTOM_MCP_SERVER_URLS = []
+)
+CUSTOM_MCP_SERVER_URLS: tuple[str, ...] = ()
 
 ###############################################################################
 ## Azure AI Search configuration (primary retriever for RAG workers)
@@ -64,6 +69,18 @@ VS_NUM_RESULTS        = int(os.getenv("VS_NUM_RESULTS", "5"))
 ## MCP Tool Creation
 #####################
 
+# Event loop reused across synchronous tool invocations; asyncio.run would
+# create and tear down a fresh loop on every call.
+_tool_loop: asyncio.AbstractEventLoop = None
+
+
+def _run_coro(coro):
+    global _tool_loop
+    if _tool_loop is None or _tool_loop.is_closed():
+        _tool_loop = asyncio.new_event_loop()
+    return _tool_loop.run_until_complete(coro)
+
+
 class MCPTool(BaseTool):
     """Custom LangChain tool that wraps MCP server functionality"""
 
@@ -83,7 +100,7 @@ class MCPTool(BaseTool):
 
     def _run(self, **kwargs) -> str:
         if self.is_custom:
-            return asyncio.run(self._run_custom_async(**kwargs))
+            return _run_coro(self._run_custom_async(**kwargs))
         else:
             mcp_client = DatabricksMCPClient(
                 server_url=self.server_url, workspace_client=self.workspace_client
@@ -92,6 +109,10 @@ class MCPTool(BaseTool):
             return "".join([c.text for c in response.content])
 
     async def _run_custom_async(self, **kwargs) -> str:
+        # Deferred: the mcp client stack is only needed for custom servers
+        from mcp import ClientSession
+        from mcp.client.streamable_http import streamablehttp_client as connect
+
         async with connect(
             self.server_url, auth=DatabricksOAuthClientProvider(self.workspace_client)
         ) as (read_stream, write_stream, _):
@@ -102,6 +123,10 @@ class MCPTool(BaseTool):
 
 
 async def get_custom_mcp_tools(ws: WorkspaceClient, server_url: str):
+    # Deferred: the mcp client stack is only needed for custom servers
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client as connect
+
     async with connect(server_url, auth=DatabricksOAuthClientProvider(ws)) as (
         read_stream,
         write_stream,
@@ -118,16 +143,20 @@ def get_managed_mcp_tools(ws: WorkspaceClient, server_url: str):
     return mcp_client.list_tools()
 
 
+# JSON-schema type -> Python type mapping, built once rather than per tool
+# and frozen so concurrent request handlers only ever read it
+_TYPE_MAPPING = MappingProxyType({"integer": int, "number": float, "boolean": bool})
+
+
 def create_langchain_tool_from_mcp(mcp_tool, server_url: str, ws: WorkspaceClient, is_custom: bool = False):
     schema = mcp_tool.inputSchema.copy()
     properties = schema.get("properties", {})
     required = schema.get("required", [])
 
-    TYPE_MAPPING = {"integer": int, "number": float, "boolean": bool}
     field_definitions = {}
     for field_name, field_info in properties.items():
         field_type_str = field_info.get("type", "string")
-        field_type = TYPE_MAPPING.get(field_type_str, str)
+        field_type = _TYPE_MAPPING.get(field_type_str, str)
         if field_name in required:
             field_definitions[field_name] = (field_type, ...)
         else:
@@ -149,23 +178,31 @@ async def create_mcp_tools(
 ) -> List[MCPTool]:
     tools = []
 
+    # Tool discovery is one HTTP round-trip per server; fan the requests out
+    # concurrently instead of paying the RTTs sequentially.
     if managed_server_urls:
-        for server_url in managed_server_urls:
-            try:
-                mcp_tools = get_managed_mcp_tools(ws, server_url)
-                for mcp_tool in mcp_tools:
-                    tools.append(create_langchain_tool_from_mcp(mcp_tool, server_url, ws, is_custom=False))
-            except Exception as e:
-                print(f"Error loading tools from managed server {server_url}: {e}")
+        listings = await asyncio.gather(
+            *(asyncio.to_thread(get_managed_mcp_tools, ws, url) for url in managed_server_urls),
+            return_exceptions=True,
+        )
+        for server_url, mcp_tools in zip(managed_server_urls, listings):
+            if isinstance(mcp_tools, BaseException):
+                logger.error("Error loading tools from managed server %s: %s", server_url, mcp_tools)
+                continue
+            for mcp_tool in mcp_tools:
+                tools.append(create_langchain_tool_from_mcp(mcp_tool, server_url, ws, is_custom=False))
 
     if custom_server_urls:
-        for server_url in custom_server_urls:
-            try:
-                mcp_tools = await get_custom_mcp_tools(ws, server_url)
-                for mcp_tool in mcp_tools:
-                    tools.append(create_langchain_tool_from_mcp(mcp_tool, server_url, ws, is_custom=True))
-            except Exception as e:
-                print(f"Error loading tools from custom server {server_url}: {e}")
+        listings = await asyncio.gather(
+            *(get_custom_mcp_tools(ws, url) for url in custom_server_urls),
+            return_exceptions=True,
+        )
+        for server_url, mcp_tools in zip(custom_server_urls, listings):
+            if isinstance(mcp_tools, BaseException):
+                logger.error("Error loading tools from custom server %s: %s", server_url, mcp_tools)
+                continue
+            for mcp_tool in mcp_tools:
+                tools.append(create_langchain_tool_from_mcp(mcp_tool, server_url, ws, is_custom=True))
 
     return tools
 
@@ -197,14 +234,43 @@ AgentState = OverallState
 ## Prompt loading
 #####################
 
+# Fallback prompts, built once at import instead of per initialize_agent() call
+_DEFAULT_PLANNER_PROMPT = (
+    "You are a research planning assistant. Break the user's query into 2-5 "
+    "non-overlapping, independent sub-questions. Each sub-question should be "
+    "self-contained and answerable on its own. Together they must cover the full query."
+)
+_DEFAULT_SYNTHESIZER_PROMPT = (
+    "You are a synthesis assistant. Given the user's original query and parallel "
+    "research findings from multiple searches, produce a comprehensive, "
+    "well-structured final answer. Cite specific findings where relevant."
+)
+
+
+@lru_cache(maxsize=32)
+def _load_prompt_cached(registry_name: str, version: str = "1") -> str:
+    """Fetch a registry prompt — one RPC per unique (name, version) per process."""
+    return str(mlflow.load_prompt(f"prompts:/{registry_name}/{version}"))
+
+
 def _load_prompt(registry_name: str, default: str) -> str:
-    """Load a prompt from the MLflow prompt registry, falling back to the inline default."""
+    """Load a prompt from the MLflow prompt registry, falling back to the inline default.
+
+    Successful lookups are memoized; failures are not, so a transient registry
+    error does not pin the fallback for the rest of the process.
+    """
     try:
-        return str(mlflow.load_prompt(f"prompts:/{registry_name}/1"))
+        return _load_prompt_cached(registry_name)
     except Exception:
         return default
 
 
+def clear_prompt_cache():
+    """Drop memoized registry prompts (e.g. after rotating a prompt version,
+    or between tests that stub the registry)."""
+    _load_prompt_cached.cache_clear()
+
+
 #####################
 ## Azure AI Search
 #####################
@@ -248,17 +314,25 @@ def planner_node(state: OverallState, config: RunnableConfig) -> dict:
     return {"partitions": approved}
 
 
+# Common field names for document text content, probed in order
+_DOC_TEXT_FIELDS = ("content", "chunk", "text", "page_content")
+
+
+def _doc_text(result) -> str:
+    for field in _DOC_TEXT_FIELDS:
+        value = result.get(field)
+        if value is not None:
+            return value
+    return str(result)
+
+
 def research_worker_node(state: WorkerState, config: RunnableConfig) -> dict:
     """Isolated RAG worker — only sees its own partition_query, not the full conversation."""
     results = _azure_search_client.search(
         search_text=state["partition_query"],
         top=VS_NUM_RESULTS,
     )
-    # Try common field names for document text content
-    docs = "\n".join(
-        r.get("content", r.get("chunk", r.get("text", r.get("page_content", str(r)))))
-        for r in results
-    )
+    docs = "\n".join(_doc_text(r) for r in results)
     # Return as a single-element list so operator.add can concatenate across workers
     return {"research_results": [f"[{state['partition_query']}]\n{docs}"]}
 
@@ -318,14 +392,13 @@ class PartitionPlannerModel(mlflow.pyfunc.PythonModel):
 
     def predict(self, context, model_input: dict, params=None) -> dict:
         messages = model_input.get("messages", [])
-        query = messages[-1]["content"] if messages else model_input.get("query", "")
+        query = messages[-1].get("content", "") if messages else model_input.get("query", "")
         thread_id = model_input.get("thread_id", "default")
         thread_config = {"configurable": {"thread_id": thread_id}}
 
-        result = partition_graph.invoke(
-            {"query": query, "partitions": [], "research_results": [], "final_answer": ""},
-            config=thread_config,
-        )
+        # Only the query needs seeding — the remaining channels are populated
+        # by the graph nodes, so don't allocate placeholder values per request.
+        result = partition_graph.invoke({"query": query}, config=thread_config)
 
         if "__interrupt__" in result:
             interrupt_val = result["__interrupt__"][0].value
@@ -336,7 +409,9 @@ class PartitionPlannerModel(mlflow.pyfunc.PythonModel):
                 "thread_id": thread_id,
             }
 
-        return {"status": "complete", "answer": result["final_answer"]}
+        # final_answer is unwritten (and omitted from the output) when no
+        # worker ran, e.g. a resume with an empty partitions list
+        return {"status": "complete", "answer": result.get("final_answer", "")}
 
     def resume(self, thread_id: str, approved_partitions: list) -> dict:
         """Resume the graph after the user confirms or edits the partition list."""
@@ -345,7 +420,7 @@ class PartitionPlannerModel(mlflow.pyfunc.PythonModel):
             Command(resume={"partitions": approved_partitions}),
             config=thread_config,
         )
-        return {"status": "complete", "answer": result["final_answer"]}
+        return {"status": "complete", "answer": result.get("final_answer", "")}
 
 
 #####################
@@ -357,33 +432,26 @@ def initialize_agent() -> PartitionPlannerModel:
 
     _azure_search_client = _build_azure_search_client()
 
-    _planner_prompt = _load_prompt(
-        "partition_planner_prompt",
-        (
-            "You are a research planning assistant. Break the user's query into 2-5 "
-            "non-overlapping, independent sub-questions. Each sub-question should be "
-            "self-contained and answerable on its own. Together they must cover the full query."
-        ),
-    )
-    _synthesizer_prompt = _load_prompt(
-        "partition_synthesizer_prompt",
-        (
-            "You are a synthesis assistant. Given the user's original query and parallel "
-            "research findings from multiple searches, produce a comprehensive, "
-            "well-structured final answer. Cite specific findings where relevant."
-        ),
-    )
+    _planner_prompt = _load_prompt("partition_planner_prompt", _DEFAULT_PLANNER_PROMPT)
+    _synthesizer_prompt = _load_prompt("partition_synthesizer_prompt", _DEFAULT_SYNTHESIZER_PROMPT)
 
     partition_graph = build_partition_graph()
     return PartitionPlannerModel()
 
 
+_mlflow_setup_done = False
+
+
 def setup_mlflow():
+    global _mlflow_setup_done
+    if _mlflow_setup_done:
+        return
     try:
         mlflow.langchain.autolog()
-        print("✓ MLflow autologging enabled")
+        _mlflow_setup_done = True
+        logger.info("✓ MLflow autologging enabled")
     except Exception as e:
-        print(f"Warning: MLflow autologging failed: {e}")
+        logger.warning("MLflow autologging failed: %s", e)
 
 
 AGENT = initialize_agent()
@@ -392,5 +460,4 @@ try:
     setup_mlflow()
     mlflow.models.set_model(AGENT)
 except Exception as e:
-    print(f"Note: MLflow model tracking not available: {e}")
-    print("Agent will work without MLflow tracking.")
+    logger.warning("MLflow model tracking not available: %s\nAgent will work without MLflow tracking.", e)
@@ -4,6 +4,8 @@ Configuration for LangGraph MCP Agent
 Update these settings to customize your agent's behavior and MCP server connections.
 """
 
+from functools import lru_cache
+
 from databricks.sdk import WorkspaceClient
 
 ###############################################################################
@@ -32,9 +34,13 @@ SYSTEM_PROMPT = "You are a helpful assistant that can run Python code."
 ## because their proxy endpoints are managed by Databricks.
 ###############################################################################
 
-# Initialize workspace client
-workspace_client = WorkspaceClient()
-host = workspace_client.config.host
+# Workspace client — constructed lazily on first access (see __getattr__ at
+# the bottom of this file) so importing this module for plain constants like
+# LLM_ENDPOINT_NAME does not pay SDK auth discovery.
+@lru_cache(maxsize=1)
+def _get_workspace_client() -> WorkspaceClient:
+    return WorkspaceClient()
+
 
 # ---------------------------------------------------------------------------
 # Managed MCP Server — simplest setup
@@ -45,13 +51,17 @@ host = workspace_client.config.host
 # Managed MCP Servers URLS (includes both fully managed and proxied external MCP)
 # - If you're using an external MCP server, create a UC connection and flag it
 #   as an MCP connection. This reveals a proxy endpoint.
-# - Add that proxy endpoint URL to this list.
+# - Add that proxy endpoint URL to the list built in _managed_mcp_server_urls().
+#   Example for external MCP:
+#   "https://<workspace-hostname>/api/2.0/mcp/external/{connection_name}"
+
 
-MANAGED_MCP_SERVER_URLS = [
-    f"{host}/api/2.0/mcp/functions/system/ai",  # Default managed MCP endpoint
-    # Example for external MCP:
-    # "https://<workspace-hostname>/api/2.0/mcp/external/{connection_name}"
-]
+@lru_cache(maxsize=1)
+def _managed_mcp_server_urls() -> tuple[str, ...]:
+    host = _get_workspace_client().config.host
+    return (
+        f"{host}/api/2.0/mcp/functions/system/ai",  # Default managed MCP endpoint
+    )
 
 # ---------------------------------------------------------------------------
 # Custom MCP Server — hosted as a Databricks App
@@ -70,9 +80,9 @@ MANAGED_MCP_SERVER_URLS = [
 # )
 
 # Custom MCP Servers — add URLs below (not managed or proxied by Databricks)
-CUSTOM_MCP_SERVER_URLS = [
-    # Example: "https://<custom-mcp-app-url>/mcp"
-]
+CUSTOM_MCP_SERVER_URLS: tuple[str, ...] = (
+    # Example: "https://<custom-mcp-app-url>/mcp",
+)
 
 
 ###############################################################################
@@ -112,6 +122,18 @@ DATABRICKS_EMBEDDING_ENDPOINT = os.getenv("DATABRICKS_EMBEDDING_ENDPOINT_NAME",
 # # For production (using Databricks secrets):
 # from dbutils import dbutils
 # os.environ["DATABRICKS_CLIENT_SECRET"] = dbutils.secrets.get(
-#     scope=client_secret_scope_name, 
+#     scope=client_secret_scope_name,
 #     key=client_secret_key_name
 # )
+
+
+# Lazy module attributes (PEP 562): resolved on first access so the import of
+# this module stays free of workspace auth.
+def __getattr__(name):
+    if name == "workspace_client":
+        return _get_workspace_client()
+    if name == "host":
+        return _get_workspace_client().config.host
+    if name == "MANAGED_MCP_SERVER_URLS":
+        return _managed_mcp_server_urls()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")